@@ -19,14 +19,16 @@ def check_solver(f):
 
 def check_instance(f):
     def eval_f(self, *terms):
-        if isinstance(terms[0], Sequence):
+        cls = terms[0].__class__
+        if cls is list or cls is tuple:
             terms = terms[0]
 
         for term in terms:
             # if it's a term object, verify that the
             # smt api instance is the same as the one
             # currently being used
-            if hasattr(term, '_smt') and term._smt != self:
+            if (term.__class__ in _TERM_TYPES or term.__class__ is functions.operator) \
+               and term._smt is not self:
                 raise ValueError('Bad! Mixing terms from different api (smt) instances')
 
         return f(self, *terms)
@@ -35,13 +37,16 @@ def check_instance(f):
 
 _TERM_TYPES = frozenset(s.Term for s in SOLVERS)
 
+_BOOL_SORT = sorts.Bool()
+_BV1_SORT = sorts.BitVec(1)
+
 class smt:
 
     __infer_sort = {bool: sorts.Bool(),
                     int: sorts.Int(),
                     float: sorts.Real()}
 
-    def __init__(self, solver_val, strict=False):
+    def __init__(self, solver_val, strict=False, share_terms=False):
         if isinstance(solver_val, str):
             solver_val = SOLVERS.from_string(solver_val)
         elif not isinstance(solver_val, SOLVERS):
@@ -53,8 +58,33 @@ class smt:
         self._solver_val = solver_val
 
         self._solver = solver_val.Solver(strict)
+        self._strict = strict
         self.constraints = []
 
+        # strictness is fixed for the instance, so choose how ApplyFun
+        # converts its arguments to solver terms once
+        if strict:
+            def solver_args(sort, args):
+                return tuple([arg.solver_term for arg in args])
+        else:
+            theory_const = self._solver.TheoryConst
+
+            def solver_args(sort, args):
+                # raw python values are converted to constants of the inferred sort
+                return tuple([arg.solver_term
+                              if arg.__class__ in _TERM_TYPES
+                              else
+                              theory_const(sort, arg)
+                              for arg in args])
+
+        self._solver_args = solver_args
+
+        # builtin operators are interned here, see functions.operator
+        self._operators = dict()
+
+        # hash-consed function applications (only if share_terms), see ApplyFun
+        self._term_cache = dict() if share_terms else None
+
         # give the instance access to functions
         for f_enum in functions.func_enum:
             op = functions.operator(self, f_enum, functions.func_symbols[f_enum.name])
@@ -64,8 +94,6 @@ class smt:
         for s in sorts.__all__:
             setattr(self, s, sorts.__dict__[s])
 
-        self._strict = strict
-
     def ConstructFun(self, fun, *args):
         # partial function evaluation all handled internally
         return fun(*args)
@@ -93,6 +121,22 @@ class smt:
 
     def Reset(self):
         self.solver.Reset()
+        self.ClearTermCache()
+
+        # solver implementations may not survive a reset (e.g. Boolector)
+        for op in self._operators.values():
+            op._solver_fun = None
+
+    def ClearTermCache(self):
+        '''
+           Drops the cached function applications
+
+           With share_terms, ApplyFun returns the same term for the same function
+           applied to the same arguments, which keeps those terms alive. Call this
+           to release them when building very large formulas.
+        '''
+        if self._term_cache is not None:
+            self._term_cache.clear()
 
     def CheckSat(self):
         return self.solver.CheckSat()
@@ -131,70 +175,172 @@ class smt:
     @check_instance
     def ApplyFun(self, fun, *args):
         # handle lists of arguments
-        if isinstance(args[0], Sequence):
+        cls = args[0].__class__
+        if cls is list or cls is tuple:
             args = tuple(args[0])
 
+        return self._apply_fun(fun, args, self._solver_val.Term, None)
+
+    def ApplyFunBatch(self, fun, arglists):
+        '''
+           Applies fun to each argument list in arglists
+
+           Returns the same terms as [ApplyFun(fun, *args) for args in arglists],
+           but the solver's implementation of fun and the term wrapper are
+           looked up once for the whole batch
+        '''
+        if fun._smt is not self:
+            raise ValueError('Bad! Mixing terms from different api (smt) instances')
+
+        Term = self._solver_val.Term
+        solver_fun = self._resolve_solver_fun(fun)
+        apply_fun = self._apply_fun
+
+        results = []
+        for args in arglists:
+            args = tuple(args)
+            for arg in args:
+                if arg.__class__ in _TERM_TYPES and arg._smt is not self:
+                    raise ValueError('Bad! Mixing terms from different api (smt) instances')
+            results.append(apply_fun(fun, args, Term, solver_fun))
+
+        return results
+
+    def _resolve_solver_fun(self, fun):
+        '''
+           Returns a function applying fun to solver terms
+        '''
+        if fun.f_type == "builtin":
+            solver_fun = fun._solver_fun
+            if solver_fun is None:
+                solver_fun = fun._solver_fun = self._solver._resolve_fun(fun.f_id, fun.args)
+            return solver_fun
+        elif fun.f_type in {"macro", "uf"}:
+            assert len(fun.args) == 0, "Defined function should not have index args"
+            apply_custom_fun = self._solver.ApplyCustomFun
+            f_id = fun.f_id
+            return lambda *args: apply_custom_fun(f_id, *args)
+
+    def _apply_fun(self, fun, args, Term, solver_fun):
+        '''
+           Applies fun to the tuple args, shared by ApplyFun and ApplyFunBatch
+
+           solver_fun is the result of _resolve_solver_fun(fun),
+           or None to resolve it only if the application isn't cached
+        '''
+        solver = self._solver
+
+        # check for mixed solvers and find the last term
+        # (for inferring the sort of raw python values)
+        last_term = None
         for arg in args:
-            if arg.__class__ is not self._solver_val.Term and \
-               arg.__class__ in _TERM_TYPES:  # raw python types are fine
-                raise ValueError('Mixing terms with different solvers is not allowed.\n'
-                                 'Found a {}, but the solver is {}'.format(arg.__class__,
-                                                                           self._solver.__class__))
-
-        ls_term = list(filter(lambda x: hasattr(x, 'solver_term'), args))
-
-        if not ls_term:
+            arg_class = arg.__class__
+            if arg_class in _TERM_TYPES:
+                if arg_class is not Term:
+                    raise ValueError('Mixing terms with different solvers is not allowed.\n'
+                                     'Found a {}, but the solver is {}'.format(arg_class,
+                                                                               solver.__class__))
+                last_term = arg
+            # raw python types are fine
+
+        # with share_terms, identical applications return the same term
+        # the key has terms by identity, raw values by type and value
+        term_cache = self._term_cache
+        key = None
+        if term_cache is not None and \
+           not (fun.f_type == "builtin" and fun.f_id in solver._side_effect_funs):
+            key = (id(fun), tuple([id(arg) if arg.__class__ in _TERM_TYPES else (arg.__class__, arg)
+                                   for arg in args]))
+            try:
+                return term_cache[key][0]
+            except KeyError:
+                pass
+            except TypeError:
+                # unhashable raw python argument, can't cache
+                key = None
+
+        if last_term is None:
             try:
                 sort = self.__infer_sort[args[-1].__class__]
             except:
                 raise RuntimeError("No smt term arguments and unable to infer argument(s) sort.")
         else:
-            sort = ls_term[-1].sort
+            sort = last_term.sort
 
-        if self._strict:
-            solver_args = tuple([arg.solver_term for arg in args])
+        solver_args = self._solver_args(sort, args)
 
-        else:
-            solver_args = tuple([arg.solver_term
-                                 if hasattr(arg, 'solver_term')
-                                 else
-                                 self.solver.TheoryConst(sort, arg)
-                                 for arg in args])
+        if solver_fun is None:
+            solver_fun = self._resolve_solver_fun(fun)
 
-        if fun.f_type == "builtin":
-            s_term = self.solver.ApplyFun(fun.f_id, fun.args, *solver_args)
-        elif fun.f_type in {"macro", "uf"}:
-            assert len(fun.args) == 0, "Defined function should not have index args"
-            s_term = self.solver.ApplyCustomFun(fun.f_id, *solver_args)
+        term = Term(self, solver_fun(*solver_args))
 
-        return self._solver_val.Term(self, s_term)
+        if key is not None:
+            # keep fun and args alive so their ids aren't reused
+            term_cache[key] = (term, fun, args)
+
+        return term
 
     @check_instance
     def Assert(self, *constraints):
-        if isinstance(constraints[0], Sequence):
+        cls = constraints[0].__class__
+        if cls is list or cls is tuple:
             constraints = tuple(constraints[0])
 
+        solver = self._solver
+
+        # check every constraint before handing them to the solver together
+        solver_constraints = []
+        solver_constraints_append = solver_constraints.append
+
         for constraint in constraints:
-            sort = getattr(constraint, 'sort', type(constraint))
+            if constraint.__class__ in _TERM_TYPES:
+                sort = constraint.sort
+                if sort is not _BOOL_SORT and sort is not _BV1_SORT:
+                    raise ValueError('Can only assert formulas of sort Bool/BitVec(1). '
+                                     'Received sort: {}'.format(sort))
+                solver_constraints_append(constraint.solver_term)
 
-            if sort not in {bool, sorts.Bool(), sorts.BitVec(1)}:
-                raise ValueError('Can only assert formulas of sort Bool/BitVec(1). '
-                                 'Received sort: {}'.format(sort))
+            elif constraint.__class__ is bool:
+                solver_constraints_append(solver.TheoryConst(_BOOL_SORT, constraint))
 
-            if hasattr(constraint, 'solver_term'):
-                c = constraint.solver_term
             else:
-                c = self.solver.TheoryConst(sorts.Bool(), constraint)
+                raise ValueError('Can only assert formulas of sort Bool/BitVec(1). '
+                                 'Received sort: {}'.format(type(constraint)))
 
-            self.solver.Assert(c)
+        solver._assert_all(solver_constraints)
 
-            # add wrapped constraint to solver assertions
-            self.constraints.append(constraint)
+        # add wrapped constraints to solver assertions
+        self.constraints.extend(constraints)
+
+    def AssertSmtlib(self, smt2_text):
+        '''
+           Asserts every assertion in a block of SMT-LIB text
+
+           The whole block is handed to the solver's parser at once, instead of
+           building and asserting each formula through ApplyFun and Assert.
+           Only declarations and assertions are used. Returns the asserted terms.
+
+           Treat the text as self-contained: it has to declare every symbol it uses.
+           Whether those symbols are the same as terms declared through the api
+           depends on the solver. Z3 shares a constant with the same name and sort,
+           CVC4's parser has its own symbol table, so (declare-fun x ...) there is
+           a new variable, unrelated to an earlier DeclareConst('x', ...).
+        '''
+        Term = self._solver_val.Term
+        constraints = [Term(self, c) for c in self._solver.AssertSmtlib(smt2_text)]
+        self.constraints.extend(constraints)
+        return constraints
 
     @property
     def Assertions(self):
         return self.solver.Assertions()
 
+    def IterAssertions(self):
+        '''
+           Iterates over the assertions, like Assertions but without building a list
+        '''
+        return self.solver.IterAssertions()
+
     def GetModel(self):
         raise NotImplementedError()
 
@@ -223,6 +369,10 @@ class smt:
 
     def Push(self):
         self.solver.Push()
+        # terms built in a scope can depend on assertions made in it
+        # (e.g. side constraints), so don't share them across scopes
+        self.ClearTermCache()
 
     def Pop(self):
         self.solver.Pop()
+        self.ClearTermCache()
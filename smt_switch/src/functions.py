@@ -3,7 +3,7 @@
 
 import sys
 import enum
-from collections import OrderedDict, Sequence
+from collections import OrderedDict
 from functools import partial
 from ..util import namedtuple_with_defaults
 
@@ -100,13 +100,41 @@ func_enum = enum.Enum('func_enum', func_d)
 func_enum.__order__ = func_symbols.keys()
 
 
-class operator:
+class _interned_operator(type):
+    '''
+       Metaclass for operator which interns builtin operators per smt instance
+
+       Builtin operators are fully determined by their function enum and
+       indices, so constructing one with the same enum and indices returns the
+       existing instance, i.e. s.BVAdd() is s.BVAdd() and
+       s.Extract(4, 2) is s.Extract(4, 2)
+
+       Custom functions (uf and macro) are not interned
+    '''
+
+    def __call__(cls, smt, func_info, fdata, *args, **kwargs):
+        if kwargs or not issubclass(func_info.__class__, enum.Enum):
+            return super().__call__(smt, func_info, fdata, *args, **kwargs)
+
+        key = (func_info, args)
+        try:
+            return smt._operators[key]
+        except KeyError:
+            op = super().__call__(smt, func_info, fdata, *args)
+            smt._operators[key] = op
+            return op
+        except TypeError:
+            # unhashable indices, can't intern
+            return super().__call__(smt, func_info, fdata, *args)
+
+
+class operator(metaclass=_interned_operator):
     '''
        Class that wraps all functions, builtin or defined.
 
        Allows for partial evaluations
 
-       _gen_operator ensures that the partial evaluations are only for the number
+       _gen_apply ensures that the partial evaluations are only for the number
        of indexes in an indexed operator (normal operators have num_index == 0)
 
        e.g. bvult can not be partially evaluated except with 0 arguments (because it is not indexed)
@@ -144,12 +172,20 @@ class operator:
         self._fdata = fdata
         self._args = args
         self._keywords = kwargs
+        self._apply = self._gen_apply()
+
+        # solver implementation of a builtin, resolved on first application
+        self._solver_fun = None
 
     def __eq__(self, other):
+        if self is other:
+            return True
         return self._fname == other._fname and self._args == other._args \
                                and self._keywords == other._keywords
 
     def __ne__(self, other):
+        if self is other:
+            return False
         return self._fname != other._fname or self._args != other._args \
                                or self._keywords != other._keywords
 
@@ -177,53 +213,99 @@ class operator:
         return '<operator: {}, {} {}>'.format(self._fname, self._args, self._keywords)
 
     def __call__(self, *args, **kwargs):
-        if args and isinstance(args[0], Sequence):
-            args = args[0]
-
-        if len(self._args) == 0 and len(args) == self._fdata.num_indices:
+        if args:
+            cls = args[0].__class__
+            if cls is list or cls is tuple:
+                args = args[0]
+
+        return self._apply(args, kwargs)
+
+    def _gen_apply(self):
+        '''
+           Generates the implementation of __call__ for this operator
+
+           Which checks are needed only depends on the operator's fdata and
+           whether its indices have been bound yet, so the branch is picked
+           once here instead of on every call.
+
+           Non-indexed operators: apply to >= min_arity args
+           Indexed operators without bound indices: bind num_indices args,
+                                                    or bind and apply
+           Indexed operators with bound indices: apply to >= min_arity args
+        '''
+        smt = self._smt
+        f_id = self._f_id
+        fdata = self._fdata
+        num_indices = fdata.num_indices
+        min_arity = fdata.min_arity
+        max_arity = fdata.max_arity
+        custom = fdata.custom
+        strict = smt.strict
+        # variadic functions use sys.maxsize, no need to check those
+        check_max_arity = strict and max_arity < sys.maxsize
+
+        def max_arity_error(nargs):
+            return ValueError('In strict mode and received {} args when max arity = {}'
+                              .format(nargs, max_arity))
+
+        def fallback(args, kwargs):
+            # check for custom behaviour
+            if custom and not strict:
+                return custom(*args, **kwargs)
+            elif num_indices == 0:
+                # non-indexed operator
+                raise ValueError('Expected {} inputs to operator but received {}'
+                                 .format(min_arity, len(args)))
+            else:
+                raise ValueError('Undefined behaviour for {}{}'
+                                 .format(self, args))
 
-            # check for custom behavior
-            if self._fdata.num_indices == 0 and self._fdata.custom and not self._smt.strict:
-                return self._fdata.custom(*args)
+        if num_indices == 0:
+            def apply(args, kwargs):
+                nargs = len(args)
+                if nargs == 0:
+                    # check for custom behavior
+                    if custom and not strict:
+                        return custom()
+                    return operator(smt, f_id, fdata, **kwargs)
 
-            else:
-                return operator(self._smt, self._f_id, self._fdata, *args, **kwargs)
+                elif nargs >= min_arity:
+                    if check_max_arity and nargs > max_arity:
+                        raise max_arity_error(nargs)
+                    return smt.ApplyFun(self, *args, **kwargs)
 
-        elif len(self._args) == self._fdata.num_indices and len(args) >= self._fdata.min_arity:
-            if self._smt.strict and len(args) > self._fdata.max_arity:
-                raise ValueError('In strict mode and received {} args when max arity = '
-                                 .format(len(args), fdata.max_arity))
+                return fallback(args, kwargs)
 
-            return self._smt.ApplyFun(self, *args, **kwargs)
+        elif len(self._args) == num_indices:
+            def apply(args, kwargs):
+                nargs = len(args)
+                if nargs >= min_arity:
+                    if check_max_arity and nargs > max_arity:
+                        raise max_arity_error(nargs)
+                    return smt.ApplyFun(self, *args, **kwargs)
 
-        elif len(args) >= self._fdata.num_indices + self._fdata.min_arity:
-            if self._smt.strict and len(args) - self._fdata.num_indices > self._fdata.max_arity:
-                raise ValueError('In strict mode and received {} function indices and' +
-                                 ' {} args when max arity = '
-                                 .format(self._fdata.num_indices,
-                                         len(args) - self._fdata.num_indices, fdata.max_arity))
+                return fallback(args, kwargs)
 
-            # always pass an operator with the minumum number of arguments
-            # this is for CVC4 to construct the function
-            op = operator(self._smt, self._f_id, self._fdata,
-                          *args[:self._fdata.num_indices])
+        else:
+            def apply(args, kwargs):
+                nargs = len(args)
+                if nargs == num_indices:
+                    return operator(smt, f_id, fdata, *args, **kwargs)
 
-            args = args[self._fdata.num_indices:]
+                elif nargs >= num_indices + min_arity:
+                    if check_max_arity and nargs - num_indices > max_arity:
+                        raise ValueError('In strict mode and received {} function indices and'
+                                         ' {} args when max arity = {}'
+                                         .format(num_indices, nargs - num_indices, max_arity))
 
-            return self._smt.ApplyFun(op, *args, **kwargs)
+                    # always pass an operator with the minumum number of arguments
+                    # this is for CVC4 to construct the function
+                    op = operator(smt, f_id, fdata, *args[:num_indices])
+                    return smt.ApplyFun(op, *args[num_indices:], **kwargs)
 
-        else:
-            # check for custom behaviour
-            if self._fdata.custom and not self._smt.strict:
-                return self._fdata.custom(*args, **kwargs)
+                return fallback(args, kwargs)
 
-            elif fdata.num_indices == 0:
-                # non-indexed operator
-                raise ValueError('Expected {} inputs to operator but received {}'
-                                 .format(fdata.min_arity, len(args)))
-            else:
-                raise ValueError('Undefined behaviour for {}{}'
-                                 .format(self, args))
+        return apply
 
     def __hash__(self):
         return (self._fname, self._args).__hash__()
@@ -3,7 +3,6 @@
 
 from .. import sorts
 from .solverbase import SolverBase
-from functools import reduce
 from ..functions import func_enum
 from collections import Sequence
 import math
@@ -17,6 +16,9 @@ else:
     _MODULE_NOT_FOUND = ModuleNotFoundError
 
 class BoolectorSolver(SolverBase):
+    # symbolic shifts assert a side constraint on the shift amount
+    _side_effect_funs = frozenset([func_enum.BVShl, func_enum.BVAshr, func_enum.BVLshr])
+
     def __init__(self, strict):
         super().__init__(strict)
 
@@ -25,12 +27,21 @@ class BoolectorSolver(SolverBase):
         # keeping track of Assertions because couldn't figure out
         # how to print a list of Assertions (other than dumping to stdout/a file)
         self._Assertions = []
+        # number of assertions at each Push, so Pop can drop the rest
+        self._AssertionScopes = []
 
         self._BoolectorSorts = {sorts.BitVec: self._btor.BitVecSort,
                                 sorts.Bool: lambda: self._btor.BitVecSort(1),
                                 sorts.Array: self._btor.ArraySort}
         # this attribute is used by an inherited function to translate sorts
         self._tosorts = self._BoolectorSorts
+
+        # for going the other way, used by BoolectorTerm
+        self._BoolectorNodeSorts = {self.module.BoolectorBVNode: lambda st: sorts.BitVec(st.width),
+                                    self.module.BoolectorConstNode: lambda st: sorts.BitVec(st.width),
+                                    self.module.BoolectorArrayNode: lambda st: sorts.Array(
+                                        sorts.BitVec(st.index_width), sorts.BitVec(st.width)),
+                                    self.module._BoolectorParamNode: lambda st: sorts.BitVec(st.width)}
         self._BoolectorFuns = {func_enum.Equals: self._btor.Eq,
                                func_enum.And: self.And,
                                func_enum.Or: self.Or,
@@ -137,7 +148,7 @@ class BoolectorSolver(SolverBase):
     def DeclareConst(self, name, sort):
         btorsort = self._translate_sorts(sort)
 
-        if sort.__class__ == sorts.Array:
+        if sort.__class__ is sorts.Array:
             btorconst = self._btor.Array(btorsort, name)
         else:
             btorconst = self._btor.Var(btorsort, name)
@@ -148,11 +159,20 @@ class BoolectorSolver(SolverBase):
         return btortconst
 
     def ApplyFun(self, f_enum, indices, *args):
-        if f_enum not in self._BoolectorFuns:
-            raise NotImplementedError("{} has not been implemented in Boolector yet".format(f_enum))
-        btor_expr = self._BoolectorFuns[f_enum](*(args + indices))
+        btor_expr = self._resolve_fun(f_enum, indices)(*args)
         return btor_expr
 
+    def _resolve_fun(self, f_enum, indices):
+        btorfun = self._BoolectorFuns.get(f_enum)
+        if btorfun is None:
+            raise NotImplementedError("{} has not been implemented in Boolector yet".format(f_enum))
+
+        if not indices:
+            return btorfun
+
+        # Boolector takes indices after the arguments
+        return lambda *args: btorfun(*(args + indices))
+
     def ApplyCustomFun(self, func, *args):
         '''
            Apply a custom function. Don't need to look up corresponding function
@@ -163,9 +183,18 @@ class BoolectorSolver(SolverBase):
 
     def Assert(self, c):
         self._btor.Assert(c)
+        self._Assertions.append(c)
+
+    def _assert_all(self, constraints):
+        btor_assert = self._btor.Assert
+        for c in constraints:
+            btor_assert(c)
+        self._Assertions.extend(constraints)
 
     def Assertions(self):
-        return self._Assertions
+        # the asserted nodes themselves (not strings like the other solvers),
+        # copied so callers can't change the bookkeeping
+        return list(self._Assertions)
 
     def GetModel(self):
         if self.Sat:
@@ -196,36 +225,55 @@ class BoolectorSolver(SolverBase):
         return self._btor.Fun(paramlist, fundef)
 
     def Push(self):
+        self._AssertionScopes.append(len(self._Assertions))
         return self._btor.Push()
 
     def Pop(self):
-        return self._btor.Pop()
+        result = self._btor.Pop()
+        if self._AssertionScopes:
+            del self._Assertions[self._AssertionScopes.pop():]
+        return result
 
     # extra functions specific to Boolector
     # And requires exactly two arguments in Boolector.
     # creating a reduction for ease of use
     def And(self, *args):
-        if isinstance(args[0], list):
+        if args[0].__class__ is list:
             args = args[0]
 
-        result = reduce(lambda x, y: self._btor.And(x, y), args)
+        btor_and = self._btor.And
+        result = args[0]
+        for arg in args[1:]:
+            result = btor_and(result, arg)
         return result
 
     def Or(self, *args):
-        if isinstance(args[0], list):
+        if args[0].__class__ is list:
             args = args[0]
 
-        result = reduce(lambda x, y: self._btor.Or(x, y), args)
+        btor_or = self._btor.Or
+        result = args[0]
+        for arg in args[1:]:
+            result = btor_or(result, arg)
         return result
 
+    # log widths for symbolic shifts only depend on the bitvector width,
+    # so they're shared between all instances and filled in lazily
+    _log2_cache = dict()
+
     def __shift_process(self, bv, shift):
-        if not isinstance(shift, int):
-            if hasattr(shift, 'bits'):
-                shift = int(shift.bits, base=2)
-            else:
-                # it's symbolic and Boolector wants the log width bitvec for shifting
-                w = math.ceil(math.log2(bv.width))
-                # add an extra assertion which gives same performance as other solvers
-                self._btor.Assert(self._btor.Or(shift[:w] == 0, bv == 0))
-                shift = shift[w-1:0]
-        return shift
+        if isinstance(shift, int):
+            return shift
+
+        if shift.__class__ is self.module.BoolectorConstNode:
+            return int(shift.bits, base=2)
+
+        # it's symbolic and Boolector wants the log width bitvec for shifting
+        width = bv.width
+        try:
+            w = self._log2_cache[width]
+        except KeyError:
+            w = self._log2_cache[width] = math.ceil(math.log2(width))
+        # add an extra assertion which gives same performance as other solvers
+        self._btor.Assert(self._btor.Or(shift[:w] == 0, bv == 0))
+        return shift[w-1:0]
@@ -14,6 +14,20 @@ class CVC4Solver(SolverBase):
     # could also use class name instead of class itself as key
     # probably better for memory reasons?
 
+    # commands run by AssertSmtlib besides collecting the assertions
+    _CVC4DeclCommands = frozenset(["declare-fun", "define-fun", "declare-sort",
+                                   "define-sort", "declare-datatypes"])
+
+    # associative functions whose nested applications are flattened, e.g.
+    # And(And(a, b), c) is built as And(a, b, c)
+    _CVC4AssocFuns = frozenset([func_enum.And, func_enum.Or, func_enum.Add,
+                                func_enum.BVAnd, func_enum.BVOr, func_enum.BVXor,
+                                func_enum.BVAdd])
+
+    # only flatten arguments with at most this many children, so that long
+    # chains aren't copied at every step and shared subterms can't blow up
+    _CVC4FlattenLimit = 32
+
     def __init__(self, strict):
         super().__init__(strict)
 
@@ -23,8 +37,9 @@ class CVC4Solver(SolverBase):
 
         self._smt = self.module.SmtEngine(self._em)
         self.temp_file_name = "cvc4-out.smt2"
-        self._smt.setOption("dump-to", self.module.SExpr(self.temp_file_name))
-        self._smt.setOption("dump", self.module.SExpr("raw-benchmark"))
+
+        # option values already wrapped in an SExpr, keyed by (option, value)
+        self._CVC4SExprCache = dict()
 
         self._CVC4Sorts = {sorts.BitVec: self._em.mkBitVectorType,
                            sorts.Int: self._em.integerType,
@@ -43,6 +58,9 @@ class CVC4Solver(SolverBase):
         # this attribute is used by an inherited function to translate sorts
         self._tosorts = self._CVC4Sorts
 
+        # CVC4 type for each (interned) sort, filled in by _translate_sorts
+        self._CVC4SortCache = dict()
+
         self._CVC4Funs = \
           reversabledict({func_enum.Extract: self.module.BitVectorExtract,
                           func_enum.Concat: self.module.BITVECTOR_CONCAT,
@@ -85,6 +103,21 @@ class CVC4Solver(SolverBase):
                           func_enum.Distinct: self.module.DISTINCT
           })
 
+        # (cvc4 function, is it an indexed operator) for each function enum
+        # an indexed operator (e.g. BitVectorExtract) is built from the indices
+        # before applying, other functions are kinds (ints)
+        self._CVC4FunInfo = {f_enum: (cvc4fun, not isinstance(cvc4fun, int))
+                             for f_enum, cvc4fun in self._CVC4Funs.items()}
+
+        # same information indexed by the (dense) function enum value
+        # None for functions CVC4 doesn't implement
+        self._CVC4FunTable = [None]*len(func_enum)
+        for f_enum, info in self._CVC4FunInfo.items():
+            self._CVC4FunTable[f_enum.value] = info
+
+        # constants for indexed operators, keyed by (function enum, indices)
+        self._CVC4OpConsts = dict()
+
         # all constants are No_op
         self._CVC4InvOps = {self.module.VARIABLE: func_enum.No_op,
                             self.module.CONST_RATIONAL: func_enum.No_op,
@@ -96,17 +129,39 @@ class CVC4Solver(SolverBase):
                             self.module.APPLY: func_enum.No_op,
                             self.module.BITVECTOR_EXTRACT: func_enum.Extract}
 
+        # CVC4 kind --> function enum, so CVC4Term can recover the operator
+        # with a single lookup
+        self._CVC4Kinds = dict(self._CVC4InvOps)
+        self._CVC4Kinds.update(self._CVC4Funs.rev.items())
+
+        # CVC4 names used on hot paths, looked up once instead of
+        # through self.module on every call
+        self._CVC4Apply = self.module.APPLY
+        self._CVC4ExtractOpKind = self.module.BITVECTOR_EXTRACT_OP
+        self._CVC4SExpr = self.module.SExpr
+
         # Theory constant functions
+        mkConst = self._em.mkConst
+        BitVector = self.module.BitVector
+        Rational = self.module.Rational
+
         def create_bv(width, value):
-            return self._em.mkConst(self.module.BitVector(width, value))
+            return mkConst(BitVector(width, value))
 
         def create_int(value):
-            return self._em.mkConst(self.module.Rational(value))
+            return mkConst(Rational(value))
 
         def create_real(value):
-            if not isinstance(value, Fraction):
+            cls = value.__class__
+            if cls is int:
+                # exact already, skip building (and limiting) a Fraction
+                return mkConst(Rational(value))
+            elif cls is float and value.is_integer():
+                # e.g. 4.0, also exact
+                return mkConst(Rational(int(value)))
+            elif cls is not Fraction:
                 value = Fraction(value).limit_denominator()
-            return self._em.mkConst(self.module.Rational(value.numerator, value.denominator))
+            return mkConst(Rational(value.numerator, value.denominator))
 
         def create_bool(value):
             return self._em.mkBoolConst(value)
@@ -116,14 +171,25 @@ class CVC4Solver(SolverBase):
                             sorts.Real: create_real,
                             sorts.Bool: create_bool}
 
+        # theory constants already created, keyed by (sort, type of value, value)
+        self._CVC4ConstCache = dict()
+
+        # values from the current model, keyed by id of the expression
+        # (which is kept alive in the entry), cleared whenever the state changes
+        self._CVC4ValueCache = dict()
+
+        self.SetOption("dump-to", self.temp_file_name)
+        self.SetOption("dump", "raw-benchmark")
+
     @classmethod
     def _import_func(cls):
         return __import__('CVC4')
 
     def Reset(self):
         self._smt.reset()
-        self._smt.setOption("dump-to", self.module.SExpr(self.temp_file_name))
-        self._smt.setOption("dump", self.module.SExpr("raw-benchmark"))
+        self._CVC4ValueCache.clear()
+        self.SetOption("dump-to", self.temp_file_name)
+        self.SetOption("dump", "raw-benchmark")
 
 
     def CheckSat(self):
@@ -131,6 +197,7 @@ class CVC4Solver(SolverBase):
         # chose this way so user can get Assertions, but also aren't added twice
         # for constraint in self.constraints:
         #    self._smt.assertFormula(constraint)
+        self._CVC4ValueCache.clear()
         self.Sat = self._smt.checkSat().isSat() == 1
         return self.Sat
 
@@ -138,7 +205,15 @@ class CVC4Solver(SolverBase):
         self._smt.setLogic(logicstr)
 
     def SetOption(self, optionstr, value):
-        self._smt.setOption(optionstr, self.module.SExpr(value))
+        key = (optionstr, value.__class__, value)
+        try:
+            sexpr = self._CVC4SExprCache[key]
+        except KeyError:
+            sexpr = self._CVC4SExprCache[key] = self._CVC4SExpr(value)
+        except TypeError:
+            # unhashable value, can't cache
+            sexpr = self._CVC4SExpr(value)
+        self._smt.setOption(optionstr, sexpr)
 
     def DeclareFun(self, name, inputsorts, outputsort):
         assert isinstance(inputsorts, Sequence), \
@@ -156,23 +231,72 @@ class CVC4Solver(SolverBase):
         cvc4const = self._em.mkVar(name, cvc4sort)
         return cvc4const
 
+    def _translate_sorts(self, sort):
+        try:
+            return self._CVC4SortCache[sort]
+        except KeyError:
+            cvc4sort = self._CVC4SortCache[sort] = super()._translate_sorts(sort)
+            return cvc4sort
+
     def TheoryConst(self, sort, value):
+        # the value's type is part of the key so that e.g. 1, 1.0 and True
+        # (which compare equal) don't share a constant
+        key = (sort, value.__class__, value)
+        try:
+            return self._CVC4ConstCache[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable value, can't cache
+            key = None
+
         cvc4tconst = self._CVC4Consts[sort.__class__](*(sort.params + (value,)))
+
+        if key is not None:
+            self._CVC4ConstCache[key] = cvc4tconst
+
         return cvc4tconst
 
     def ApplyFun(self, f_enum, indices, *args):
+        cvc4expr = self._resolve_fun(f_enum, indices)(*args)
+        return cvc4expr
 
-        if f_enum not in self._CVC4Funs:
-            raise NotImplementedError("{} has not been implemented in CVC4 yet".format(f_enum))
-
-        cvc4fun = self._CVC4Funs[f_enum]
+    def _resolve_fun(self, f_enum, indices):
+        try:
+            cvc4fun, indexed = self._CVC4FunTable[f_enum.value]
+        except (AttributeError, IndexError, TypeError):
+            # not a function enum (or not implemented), fall back to the dict
+            if f_enum not in self._CVC4FunInfo:
+                raise NotImplementedError("{} has not been implemented in CVC4 yet".format(f_enum))
+            cvc4fun, indexed = self._CVC4FunInfo[f_enum]
 
         # check if just indexer or needs to be evaluated
         # TODO: handle situation where all args together
-        if not isinstance(cvc4fun, int):
-            cvc4fun = self._em.mkConst(cvc4fun(*indices))
-        cvc4expr = self._em.mkExpr(cvc4fun, args)
-        return cvc4expr
+        if indexed:
+            key = (f_enum, indices)
+            try:
+                cvc4fun = self._CVC4OpConsts[key]
+            except KeyError:
+                cvc4fun = self._CVC4OpConsts[key] = self._em.mkConst(cvc4fun(*indices))
+
+        mkExpr = self._em.mkExpr
+
+        if f_enum in self._CVC4AssocFuns:
+            flatten_limit = self._CVC4FlattenLimit
+
+            def apply_assoc(*args):
+                # arguments built here are already flat, so one level is enough
+                flat_args = []
+                for arg in args:
+                    if arg.getKind() == cvc4fun and arg.getNumChildren() <= flatten_limit:
+                        flat_args.extend(arg.getChildren())
+                    else:
+                        flat_args.append(arg)
+                return mkExpr(cvc4fun, flat_args)
+
+            return apply_assoc
+
+        return lambda *args: mkExpr(cvc4fun, args)
 
     def ApplyCustomFun(self, func, *args):
         '''
@@ -180,20 +304,59 @@ class CVC4Solver(SolverBase):
            -- assume func is a CVC4 function.
         '''
         if self._smt.isDefinedFunction(func):
-            cvc4expr = self._em.mkExpr(self.module.APPLY, func, *args)
+            cvc4expr = self._em.mkExpr(self._CVC4Apply, func, *args)
         else:
             cvc4expr = self._em.mkExpr(func, *args)
 
         return cvc4expr
 
     def Assert(self, c):
-            self._smt.assertFormula(c)
+        self._CVC4ValueCache.clear()
+        self._smt.assertFormula(c)
+
+    def _assert_all(self, constraints):
+        # CVC4 has no batch assert, but avoid the method lookups per constraint
+        self._CVC4ValueCache.clear()
+        assert_formula = self._smt.assertFormula
+        for c in constraints:
+            assert_formula(c)
+
+    def AssertSmtlib(self, smt2_text):
+        # the parser keeps its own symbol table, so the text needs to declare
+        # every symbol it uses
+        parser = self.module.ParserBuilder(self._em, "<string>") \
+                     .withInputLanguage(self.module.INPUT_LANG_SMTLIB_V2_5) \
+                     .withStringInput(smt2_text).build()
+
+        # only declarations are run and assertions collected, any other command
+        # (check-sat, push/pop, the set-logic the parser adds, ...) would bypass
+        # this solver's state, so it's skipped
+        assertions = []
+        cmd = parser.nextCommand()
+        while cmd is not None:
+            name = cmd.getCommandName()
+            if name == "assert":
+                assertions.append(cmd.getExpr())
+            elif name in self._CVC4DeclCommands:
+                cmd.invoke(self._smt)
+            cmd = parser.nextCommand()
+
+        self._assert_all(assertions)
+        return assertions
 
     def Assertions(self):
         # TODO: fix iter error
         # Wanted these to be an iter but CVC4 threw an exception
         return [expr.toString() for expr in self._smt.getAssertions()]
 
+    def IterAssertions(self):
+        # get the assertions now, like the other solvers, but only convert
+        # them as they're consumed
+        # index into the vector, which the generator keeps alive,
+        # rather than iterating over it
+        assertions = self._smt.getAssertions()
+        return (assertions[i].toString() for i in range(assertions.size()))
+
     def GetModel(self):
         if self.Sat:
             # TODO: Fix this
@@ -205,7 +368,12 @@ class CVC4Solver(SolverBase):
 
     def GetValue(self, var):
         if self.Sat:
-            return self._smt.getValue(var)
+            try:
+                return self._CVC4ValueCache[id(var)][1]
+            except KeyError:
+                value = self._smt.getValue(var)
+                self._CVC4ValueCache[id(var)] = (var, value)
+                return value
         elif self.Sat is not None:
             raise RuntimeError('Problem is unsat')
         else:
@@ -216,12 +384,11 @@ class CVC4Solver(SolverBase):
         os.rename(os.getcwd() + "/" + self.temp_file_name, filename)
 
     def Symbol(self, name, sort):
-        cvc4sort = self._CVC4Sorts[sort.__class__](*sort.params)
+        cvc4sort = self._translate_sorts(sort)
         return self._em.mkBoundVar(name, cvc4sort)
 
     def DefineFun(self, name, sortlist, paramlist, fundef):
-        cvc4sorts = [self._CVC4Sorts[sort.__class__](*sort.params)
-                         for sort in sortlist]
+        cvc4sorts = [self._translate_sorts(sort) for sort in sortlist]
         outsort = cvc4sorts[-1]
         cvc4sorts = cvc4sorts[:-1]
         funtype = self._em.mkFunctionType(cvc4sorts, outsort)
@@ -230,7 +397,9 @@ class CVC4Solver(SolverBase):
         return lam
 
     def Push(self):
+        self._CVC4ValueCache.clear()
         self._smt.push()
 
     def Pop(self):
+        self._CVC4ValueCache.clear()
         self._smt.pop()
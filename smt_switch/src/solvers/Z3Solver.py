@@ -6,6 +6,7 @@ from ..functions import func_enum
 from .solverbase import SolverBase
 from smt_switch.util import reversabledict
 from collections import Sequence
+import operator as _operator
 
 
 class Z3Solver(SolverBase):
@@ -45,41 +46,43 @@ class Z3Solver(SolverBase):
                         sorts.Bool: self.module.Bool,
                         sorts.Array: create_array}
 
+        # z3 overloads the python operators, use the builtin operator functions
+        # rather than a lambda (and an extra python frame) per application
         self._z3Funs = {func_enum.Extract: self.module.Extract,
                    func_enum.Concat: self.module.Concat,
                    func_enum.ZeroExt: self.module.ZeroExt,
                    func_enum.Not: self.module.Not,
-                   func_enum.Equals: lambda arg1, arg2: arg1 == arg2,
+                   func_enum.Equals: _operator.eq,
                    func_enum.And: self.module.And,
                    func_enum.Or: self.module.Or,
                    func_enum.Ite: self.module.If,
-                   func_enum.Sub: lambda arg1, arg2: arg1 - arg2,
-                   func_enum.Add: lambda arg1, arg2: arg1 + arg2,
-                   func_enum.LT: lambda arg1, arg2: arg1 < arg2,
-                   func_enum.LEQ: lambda arg1, arg2: arg1 <= arg2,
-                   func_enum.GT: lambda arg1, arg2: arg1 > arg2,
-                   func_enum.GEQ: lambda arg1, arg2: arg1 >= arg2,
-                   func_enum.BVAnd: lambda arg1, arg2: arg1 & arg2,
-                   func_enum.BVOr: lambda arg1, arg2: arg1 | arg2,
-                   func_enum.BVXor: lambda arg1, arg2: arg1 ^ arg2,
-                   func_enum.BVAdd: lambda arg1, arg2: arg1 + arg2,
-                   func_enum.BVSub: lambda arg1, arg2: arg1 - arg2,
-                   func_enum.BVMul: lambda arg1, arg2: arg1*arg2,
+                   func_enum.Sub: _operator.sub,
+                   func_enum.Add: _operator.add,
+                   func_enum.LT: _operator.lt,
+                   func_enum.LEQ: _operator.le,
+                   func_enum.GT: _operator.gt,
+                   func_enum.GEQ: _operator.ge,
+                   func_enum.BVAnd: _operator.and_,
+                   func_enum.BVOr: _operator.or_,
+                   func_enum.BVXor: _operator.xor,
+                   func_enum.BVAdd: _operator.add,
+                   func_enum.BVSub: _operator.sub,
+                   func_enum.BVMul: _operator.mul,
                    func_enum.BVUdiv: self.module.UDiv,
                    func_enum.BVUrem: self.module.URem,
-                   func_enum.BVShl: lambda arg1, arg2: arg1 << arg2,
-                   func_enum.BVAshr: lambda arg1, arg2: arg1 >> arg2,
+                   func_enum.BVShl: _operator.lshift,
+                   func_enum.BVAshr: _operator.rshift,
                    func_enum.BVLshr: self.module.LShR,
                    func_enum.BVUlt: self.module.ULT,
                    func_enum.BVUle: self.module.ULE,
                    func_enum.BVUgt: self.module.UGT,
                    func_enum.BVUge: self.module.UGE,
-                   func_enum.BVSlt: lambda arg1, arg2: arg1 < arg2,
-                   func_enum.BVSle: lambda arg1, arg2: arg1 <= arg2,
-                   func_enum.BVSgt: lambda arg1, arg2: arg1 > arg2,
-                   func_enum.BVSge: lambda arg1, arg2: arg1 >= arg2,
-                   func_enum.BVNot: lambda arg: ~arg,
-                   func_enum.BVNeg: lambda arg: -arg,
+                   func_enum.BVSlt: _operator.lt,
+                   func_enum.BVSle: _operator.le,
+                   func_enum.BVSgt: _operator.gt,
+                   func_enum.BVSge: _operator.ge,
+                   func_enum.BVNot: _operator.invert,
+                   func_enum.BVNeg: _operator.neg,
                    func_enum.Store: self.module.Store,
                    func_enum.Select: self.module.Select,
                    func_enum.Distinct: self.module.Distinct
@@ -186,22 +189,42 @@ class Z3Solver(SolverBase):
         return z3tconst
 
     def ApplyFun(self, f_enum, indices, *args):
-        # Some versions of python don't allow fun(*list1, *list2) so combining
-        z3expr = self._z3Funs[f_enum](*(indices + args))
+        z3expr = self._resolve_fun(f_enum, indices)(*args)
         return z3expr
 
+    def _resolve_fun(self, f_enum, indices):
+        z3fun = self._z3Funs[f_enum]
+
+        if not indices:
+            return z3fun
+
+        # Some versions of python don't allow fun(*list1, *list2) so combining
+        return lambda *args: z3fun(*(indices + args))
+
     def ApplyCustomFun(self, func, *args):
         return func(*args)
 
     def Assert(self, c):
         self._solver.add(c)
 
+    def _assert_all(self, constraints):
+        self._solver.add(*constraints)
+
+    def AssertSmtlib(self, smt2_text):
+        # symbols declared in the text are the same as terms of the same name and sort
+        assertions = self.module.parse_smt2_string(smt2_text)
+        self._solver.add(assertions)
+        return list(assertions)
+
     def Assertions(self):
         # had issue with returning an iterable for CVC4
         # thus to keep things consistent, returning a list here
         # it also mimics both z3 and cvc4's normal behavior to use a list
         return [assertion.sexpr() for assertion in self._solver.assertions()]
 
+    def IterAssertions(self):
+        return (assertion.sexpr() for assertion in self._solver.assertions())
+
     def GetModel(self):
         if self.Sat:
             return self._solver.model()
@@ -6,6 +6,10 @@ from .. import sorts
 
 
 class SolverBase(metaclass=ABCMeta):
+    # builtin functions (func_enum) whose implementation changes the solver
+    # state besides building a term, the api never shares their applications
+    _side_effect_funs = frozenset()
+
     def __init__(self, strict):
         self.constraints = []
         self.Sat = None
@@ -68,6 +72,12 @@ class SolverBase(metaclass=ABCMeta):
 
     @abstractproperty
     def Assertions(self):
+        '''
+        Returns a list of the current assertions
+
+        CVC4 and Z3 give each assertion as an SMT-LIB string. Boolector
+        can't print a single node, so it gives the asserted BoolectorNodes.
+        '''
         pass
 
     @abstractmethod
@@ -98,6 +108,48 @@ class SolverBase(metaclass=ABCMeta):
     def Pop(self):
         pass
 
+    def _assert_all(self, constraints):
+        '''
+        Asserts a list of (already validated) solver terms
+
+        The api calls this once per Assert. Solvers can override it
+        to hand the whole list to the underlying solver at once.
+        '''
+        solver_assert = self.Assert
+        for c in constraints:
+            solver_assert(c)
+
+    def _resolve_fun(self, f_enum, indices):
+        '''
+        Returns a function applying the builtin f_enum (with indices) to solver terms
+
+        The api resolves each builtin operator once and reuses the result
+        for every application. Solvers can override this to hand back their
+        implementation directly instead of going through ApplyFun.
+        '''
+        apply_fun = self.ApplyFun
+        return lambda *args: apply_fun(f_enum, indices, *args)
+
+    def IterAssertions(self):
+        '''
+        Iterates over the assertions in the same form as Assertions
+
+        Solvers can override this to only convert each assertion
+        as it is consumed.
+        '''
+        return iter(self.Assertions())
+
+    def AssertSmtlib(self, smt2_text):
+        '''
+        Parses a block of SMT-LIB text and asserts its assertions
+
+        The text should only declare symbols and make assertions, other
+        commands (e.g. check-sat) are not run. Returns the asserted solver
+        terms. Not every solver can parse SMT-LIB from a string.
+        '''
+        raise NotImplementedError('{} does not support asserting SMT-LIB text'
+                                  .format(self.__class__.__name__))
+
     def _translate_sorts(self, sort):
         '''
         Recursive function for translating parameterized sorts
@@ -1,12 +1,43 @@
 # This file is part of the smt-switch project.
 # See the file LICENSE in the top-level source directory for licensing information.
 
-from abc import ABCMeta, abstractmethod
-
 __all__ = ['BitVec', 'Int', 'Real', 'Bool', 'Array']
 
-class SortBase(metaclass=ABCMeta):
-    @abstractmethod
+
+class _interned_sort(type):
+    '''
+       Metaclass for sorts which interns them by class and parameters
+
+       Sorts are immutable, so each distinct sort is only created once,
+       e.g. Bool() is Bool() and BitVec(8) is BitVec(8), and sorts can be
+       compared by identity
+    '''
+
+    _instances = dict()
+
+    def __call__(cls, *args, **kwargs):
+        if kwargs:
+            # bind keyword arguments positionally, so e.g. BitVec(width=8)
+            # is interned as BitVec(8)
+            sort = super().__call__(*args, **kwargs)
+            args = sort.params
+            try:
+                return cls._instances.setdefault((cls, args), sort)
+            except TypeError:
+                return sort
+
+        key = (cls, args)
+        try:
+            return cls._instances[key]
+        except KeyError:
+            sort = cls._instances[key] = super().__call__(*args)
+            return sort
+        except TypeError:
+            # unhashable parameters, can't intern
+            return super().__call__(*args)
+
+
+class SortBase(metaclass=_interned_sort):
     def __init__(self, sexpr, children):
         self._sexpr = sexpr
         self._children = children
@@ -28,10 +59,11 @@ class SortBase(metaclass=ABCMeta):
         return self._sexpr
 
     def __eq__(self, other):
-        return isinstance(other, type(self)) and self._sexpr == other.sexpr
+        return self is other or \
+            (other.__class__ is self.__class__ and self._sexpr == other._sexpr)
 
     def __ne__(self, other):
-        return not isinstance(other, type(self)) or not self._sexpr == other.sexpr
+        return not self.__eq__(other)
 
     def __hash__(self):
         return hash(self._sexpr)
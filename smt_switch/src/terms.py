@@ -1,14 +1,22 @@
 # This file is part of the smt-switch project.
 # See the file LICENSE in the top-level source directory for licensing information.
 
-from abc import ABCMeta
 from . import sorts
 from fractions import Fraction
-from .functions import func_enum, func_symbols, operator
+from .functions import func_enum
 import re
 
+_BOOL_SORT = sorts.Bool()
+_INT_SORT = sorts.Int()
+_REAL_SORT = sorts.Real()
+
+
+class TermBase:
+    # every function application creates a term, so don't give each one a __dict__
+    # (but keep them weakly referenceable)
+    __slots__ = ('_smt', '_solver_term', '_value', '_sort', '_op', '_children', '_issym',
+                 '__weakref__')
 
-class TermBase(metaclass=ABCMeta):
     def __init__(self, smt, solver_term, sort, op=None, children=None):
         self._smt = smt
         self._solver_term = solver_term
@@ -41,7 +49,7 @@ class TermBase(metaclass=ABCMeta):
         return self._smt.ApplyFun(self._smt.Not, self == other)
 
     def __add__(self, other):
-        if self.sort.__class__ == sorts.BitVec:
+        if self.sort.__class__ is sorts.BitVec:
             return self._smt.ApplyFun(self._smt.BVAdd, self, other)
         else:
             return self._smt.ApplyFun(self._smt.Add, self, other)
@@ -51,27 +59,27 @@ class TermBase(metaclass=ABCMeta):
 
     def __sub__(self, other):
         # override for bitvectors
-        if self.sort.__class__ == sorts.BitVec:
+        if self.sort.__class__ is sorts.BitVec:
             return self._smt.ApplyFun(self._smt.BVSub, self, other)
         else:
             return self._smt.ApplyFun(self._smt.Sub, self, other)
 
     def __rsub__(self, other):
         # override for bitvectors
-        if self.sort.__class__ == sorts.BitVec:
+        if self.sort.__class__ is sorts.BitVec:
             return self._smt.ApplyFun(self._smt.BVSub, other, self)
         else:
             return self._smt.ApplyFun(self._smt.Sub, other, self)
 
     def __neg__(self):
-        if self.sort.__class__ == sorts.BitVec:
+        if self.sort.__class__ is sorts.BitVec:
             return self._smt.ApplyFun(self._smt.BVNeg, self)
         else:
             zero = self._smt.TheoryConst(self.sort, 0)
             return self._smt.ApplyFun(self._smt.Sub, zero, self)
 
     def __mul__(self, other):
-        if self.sort.__class__ == sorts.BitVec:
+        if self.sort.__class__ is sorts.BitVec:
             return self._smt.ApplyFun(self._smt.BVMul, self, other)
         else:
             raise NotImplementedError("Haven't added nonlinear arithmetic operators yet.")
@@ -80,51 +88,51 @@ class TermBase(metaclass=ABCMeta):
         return self.__mul__(other)
 
     def __mod__(self, other):
-        if self.sort.__class__ == sorts.BitVec:
+        if self.sort.__class__ is sorts.BitVec:
             return self._smt.ApplyFun(self._smt.BVUrem, self, other)
         else:
             raise NotImplementedError("Haven't added nonlinear arithmetic operators yet.")
 
     def __truediv__(self, other):
-        if self.sort.__class__ == sorts.BitVec:
+        if self.sort.__class__ is sorts.BitVec:
             return self._smt.ApplyFun(self._smt.BVUdiv, self, other)
         else:
             raise NotImplementedError("Haven't added nonlinear arithmetic operators yet.")
 
     def __rtruediv__(self, other):
-        if self.sort.__class__ == sorts.BitVec:
+        if self.sort.__class__ is sorts.BitVec:
             return self._smt.ApplyFun(self._smt.BVUdiv, other, self)
         else:
             raise NotImplementedError("Haven't added nonlinear arithmetic operators yet.")
 
     def __lt__(self, other):
-        assert not hasattr(other, "sort") or self.sort == other.sort, \
+        assert not isinstance(other, TermBase) or self.sort == other.sort, \
           "Operator expects 2 arguments of same sort"
-        if self.sort.__class__ == sorts.BitVec:
+        if self.sort.__class__ is sorts.BitVec:
             return self._smt.ApplyFun(self._smt.BVSlt, self, other)
 
         return self._smt.ApplyFun(self._smt.LT, self, other)
 
     def __le__(self, other):
-        assert not hasattr(other, "sort") or self.sort == other.sort, \
+        assert not isinstance(other, TermBase) or self.sort == other.sort, \
           "Operator expects 2 arguments of same sort"
-        if self.sort.__class__ == sorts.BitVec:
+        if self.sort.__class__ is sorts.BitVec:
             return self._smt.ApplyFun(self._smt.BVSle, self, other)
 
         return self._smt.ApplyFun(self._smt.LEQ, self, other)
 
     def __gt__(self, other):
-        assert not hasattr(other, "sort") or self.sort == other.sort, \
+        assert not isinstance(other, TermBase) or self.sort == other.sort, \
           "Operator expects 2 arguments of same sort"
-        if self.sort.__class__ == sorts.BitVec:
+        if self.sort.__class__ is sorts.BitVec:
             return self._smt.ApplyFun(self._smt.BVSgt, self, other)
 
         return self._smt.ApplyFun(self._smt.GT, self, other)
 
     def __ge__(self, other):
-        assert not hasattr(other, "sort") or self.sort == other.sort, \
+        assert not isinstance(other, TermBase) or self.sort == other.sort, \
           "Operator expects 2 arguments of same sort"
-        if self.sort.__class__ == sorts.BitVec:
+        if self.sort.__class__ is sorts.BitVec:
             return self._smt.ApplyFun(self._smt.BVSge, self, other)
 
         return self._smt.ApplyFun(self._smt.GEQ, self, other)
@@ -166,11 +174,11 @@ class TermBase(metaclass=ABCMeta):
         return self._smt.ApplyFun(self._smt.BVAshr, other, self)
 
     def __invert__(self):
-        assert self.sort.__class__ == sorts.BitVec
+        assert self.sort.__class__ is sorts.BitVec
         return self._smt.ApplyFun(self._smt.BVNot, self)
 
     def __getitem__(self, idx):
-        if self.sort.__class__ != self._smt.BitVec:
+        if self.sort.__class__ is not sorts.BitVec:
             raise ValueError('Slicing only defined for BitVec sorts')
 
         if isinstance(idx, slice):
@@ -197,43 +205,67 @@ class TermBase(metaclass=ABCMeta):
             raise ValueError('Slicing not defined for {}'.format(idx))
 
 
-class CVC4Term(TermBase):
-    def __init__(self, smt, solver_term):
-        self._str2sort = {'int': lambda p: sorts.Int(),
-                          'real': lambda p: sorts.Real(),
-                          'bitvector': lambda p: sorts.BitVec(p),
-                          'bitvec': lambda p: sorts.BitVec(p),
-                          'bool': lambda p: sorts.Bool(),
-                          'boolean': lambda p: sorts.Bool(),
-                          'array': lambda ids, ds: sorts.Array(ids, ds)
-                          }
+# used by CVC4Term to recover the sort from CVC4's type string
+# built once at import rather than for every term
+_cvc4_str2sort = {'int': lambda p: sorts.Int(),
+                  'real': lambda p: sorts.Real(),
+                  'bitvector': lambda p: sorts.BitVec(p),
+                  'bitvec': lambda p: sorts.BitVec(p),
+                  'bool': lambda p: sorts.Bool(),
+                  'boolean': lambda p: sorts.Bool(),
+                  'array': lambda ids, ds: sorts.Array(ids, ds)
+                  }
 
-        p = re.compile('\(?(_ )?(?P<sort>int|real|bitvector|bitvec|bool|array)\s?\(?(?P<param>\d+)?\)?')
+_cvc4_sort_pattern = re.compile(r'\(?(_ )?(?P<sort>int|real|bitvector|bitvec|bool|array)\s?\(?(?P<param>\d+)?\)?')
+
+
+# sorts already recovered, keyed by CVC4's (lowercased) type string
+_cvc4_sort_cache = dict()
 
-        cvc4sortstr = solver_term.getType().toString().lower()
-        match = p.search(cvc4sortstr)
 
-        if not match:
-            raise ValueError("Unknown type {}".format(cvc4sortstr))
+def _cvc4_parse_sort(cvc4sortstr):
+    '''
+       Recovers the smt-switch sort from a (lowercased) CVC4 type string
+    '''
+    str2sort = _cvc4_str2sort
+    p = _cvc4_sort_pattern
 
-        assert match.group('sort') in self._str2sort, 'Found {} for string {}'.format(match.group('sort'), cvc4sortstr)
+    match = p.search(cvc4sortstr)
 
-        params = (None,)
+    if not match:
+        raise ValueError("Unknown type {}".format(cvc4sortstr))
 
-        # TODO: Clean up array -- fix so same as other cases
-        if match.group('sort') == 'array':
-            # get parameterized values
-            idxmatch = p.search(cvc4sortstr[match.span(0)[1]:])
-            dmatch = p.search(cvc4sortstr[idxmatch.span(0)[1]:])
-            idxsort = self._str2sort[idxmatch.group('sort')](idxmatch.group('param'))
-            dsort = self._str2sort[dmatch.group('sort')](dmatch.group('param'))
-            params = (idxsort, dsort)
+    assert match.group('sort') in str2sort, 'Found {} for string {}'.format(match.group('sort'), cvc4sortstr)
 
-        elif 'bitvec' in match.group('sort'):
-            assert match.group('param'), 'BitVecs must have a width'
-            params = (int(match.group('param')),)
+    params = (None,)
 
-        sort = self._str2sort[match.group('sort')](*params)
+    # TODO: Clean up array -- fix so same as other cases
+    if match.group('sort') == 'array':
+        # get parameterized values
+        idxmatch = p.search(cvc4sortstr[match.span(0)[1]:])
+        dmatch = p.search(cvc4sortstr[idxmatch.span(0)[1]:])
+        idxparam, dparam = idxmatch.group('param'), dmatch.group('param')
+        idxsort = str2sort[idxmatch.group('sort')](int(idxparam) if idxparam else None)
+        dsort = str2sort[dmatch.group('sort')](int(dparam) if dparam else None)
+        params = (idxsort, dsort)
+
+    elif 'bitvec' in match.group('sort'):
+        assert match.group('param'), 'BitVecs must have a width'
+        params = (int(match.group('param')),)
+
+    return str2sort[match.group('sort')](*params)
+
+
+class CVC4Term(TermBase):
+    __slots__ = ()
+
+    def __init__(self, smt, solver_term):
+        # terms share a handful of types, only parse each type string once
+        cvc4sortstr = solver_term.getType().toString().lower()
+        try:
+            sort = _cvc4_sort_cache[cvc4sortstr]
+        except KeyError:
+            sort = _cvc4_sort_cache[cvc4sortstr] = _cvc4_parse_sort(cvc4sortstr)
 
         # TODO: handle this check more elegantly -- perhaps a lambda in the dict
         extk= -1
@@ -243,55 +275,55 @@ class CVC4Term(TermBase):
 
         k = solver_term.getKind()
 
-        if extk == smt._solver.module.BITVECTOR_EXTRACT_OP:
+        if extk == smt._solver._CVC4ExtractOpKind:
             assert 'cvc4_op' in locals()
             ext_op = cvc4_op.getConstBitVectorExtract()
             op = smt.Extract(ext_op.high, ext_op.low)
-        elif k in smt.solver._CVC4Funs.rev:
-            enum_op = smt.solver._CVC4Funs.rev[k]
-            op = operator(smt, enum_op, func_symbols[enum_op.name])
-        elif k in smt.solver._CVC4InvOps:
-            enum_op = smt.solver._CVC4InvOps[k]
-            op = operator(smt, enum_op, func_symbols[enum_op.name])
         else:
-            raise KeyError('{} not a recognized CVC4 enum'.format(k))
-
-        # query children from solver
-        children = []
-        for c in solver_term.getChildren():
-            children.append(CVC4Term(smt, c))
+            try:
+                enum_op = smt.solver._CVC4Kinds[k]
+            except KeyError:
+                raise KeyError('{} not a recognized CVC4 enum'.format(k))
+            op = getattr(smt, enum_op.name)
 
-        super().__init__(smt, solver_term, sort, op, children)
+        # children are queried from the solver on first access
+        super().__init__(smt, solver_term, sort, op)
 
+    @property
+    def children(self):
+        if self._children is None:
+            smt = self._smt
+            self._children = [CVC4Term(smt, c) for c in self._solver_term.getChildren()]
+        return self._children
 
     def __repr__(self):
         return self.solver_term.toString()
 
     def as_int(self):
-        if self.sort == self._smt.Int():
+        if self.sort is _INT_SORT:
             return int(self._value.getConstRational().getDouble())
 
-        elif self.sort.__class__ == self._smt.BitVec:
+        elif self.sort.__class__ is sorts.BitVec:
             return self._value.getConstBitVector().toInteger().toUnsignedInt()
 
         else:
             raise ValueError('Mismatched sort for request')
 
     def as_double(self):
-        if self.sort == self._smt.Real:
+        if self.sort is _REAL_SORT:
             return self._value.getConstRational().getDouble()
         else:
             raise ValueError
 
     def as_fraction(self):
-        if self.sort != self._smt.Real():
+        if self.sort is not _REAL_SORT:
             raise ValueError
         r = self._value.getConstRational()
         return Fraction(r.getNumerator().toSignedInt(),
                         r.getDenominator().toSignedInt())
 
     def as_bool(self):
-        if self.sort != self._smt.Bool():
+        if self.sort is not _BOOL_SORT:
             raise ValueError
 
         return self._value.getConstBoolean()
@@ -303,7 +335,7 @@ class CVC4Term(TermBase):
         '''
         Gets value of array as list of tuples in order of store operators
         '''
-        if self.sort.__class__ != sorts.Array:
+        if self.sort.__class__ is not sorts.Array:
             raise RuntimeError("Cannot call as_list on sort: {}".format(self.sort))
 
         kvpairs = []
@@ -313,7 +345,7 @@ class CVC4Term(TermBase):
             # get CVC4Terms
             t = tuple(self._smt.GetValue(CVC4Term(self._smt, x)) for x in t)
             # TODO: Figure out best representation -- boolector uses bitstrings
-            t = tuple(x.as_bitstr() if x.sort.__class__ == sorts.BitVec else x.as_int() for x in t)
+            t = tuple(x.as_bitstr() if x.sort.__class__ is sorts.BitVec else x.as_int() for x in t)
             kvpairs.append(t)
             expr = expr.getChildren()[0]
 
@@ -321,6 +353,8 @@ class CVC4Term(TermBase):
 
 
 class Z3Term(TermBase):
+    __slots__ = ()
+
     def __init__(self, smt, solver_term):
 
         sts = solver_term.sort()
@@ -328,18 +362,23 @@ class Z3Term(TermBase):
 
         # TODO: fix for uninterpreted functions
         enum_op = smt.solver._z3Funs2swFuns[solver_term.decl().kind()]
-        op = operator(smt, enum_op, func_symbols[enum_op.name])
 
         # TODO: Find better solution than this
-        if enum_op == func_enum.Extract:
+        if enum_op is func_enum.Extract:
             op = smt.Extract(*solver_term.decl().params())
+        else:
+            # the api already holds the (interned) operator for each function
+            op = getattr(smt, enum_op.name)
 
-        # create children
-        children = []
-        for c in solver_term.children():
-            children.append(Z3Term(smt, c))
+        # children are queried from the solver on first access
+        super().__init__(smt, solver_term, sort, op)
 
-        super().__init__(smt, solver_term, sort, op, children)
+    @property
+    def children(self):
+        if self._children is None:
+            smt = self._smt
+            self._children = [Z3Term(smt, c) for c in self._solver_term.children()]
+        return self._children
 
     def __repr__(self):
         if self._smt.strict:
@@ -357,7 +396,7 @@ class Z3Term(TermBase):
         return self._value.as_fraction()
 
     def as_bool(self):
-        if self.sort != self._smt.Bool():
+        if self.sort is not _BOOL_SORT:
             raise ValueError
 
         return bool(self._value)
@@ -369,7 +408,7 @@ class Z3Term(TermBase):
         '''
         Gets value of array as list of tuples in order of store operators
         '''
-        if self.sort.__class__ != sorts.Array:
+        if self.sort.__class__ is not sorts.Array:
             raise RuntimeError("Cannot call as_list on sort: {}".format(self.sort))
 
         kvpairs = []
@@ -380,7 +419,7 @@ class Z3Term(TermBase):
             t = tuple(self._smt.GetValue(Z3Term(self._smt, x)) for x in t)
             # TODO: Figure out best representation -- boolector uses bitstrings
             # but might be nice to know symbolic variable name
-            t = tuple(x.as_bitstr() if x.sort.__class__ == sorts.BitVec else x.as_int() for x in t)
+            t = tuple(x.as_bitstr() if x.sort.__class__ is sorts.BitVec else x.as_int() for x in t)
             kvpairs.append(t)
             expr = expr.children()[0]
 
@@ -388,14 +427,10 @@ class Z3Term(TermBase):
 
 
 class BoolectorTerm(TermBase):
+    __slots__ = ()
+
     def __init__(self, smt, solver_term):
-        boolector = smt.solver.module
-        sortmap = {boolector.BoolectorBVNode: lambda st: sorts.BitVec(st.width),
-                   boolector.BoolectorConstNode: lambda st: sorts.BitVec(st.width),
-                   boolector.BoolectorArrayNode: lambda st: sorts.Array(
-                       sorts.BitVec(st.index_width), sorts.BitVec(st.width)),
-                   boolector._BoolectorParamNode: lambda st: sorts.BitVec(st.width)}
-        sort = sortmap[type(solver_term)](solver_term)
+        sort = smt.solver._BoolectorNodeSorts[type(solver_term)](solver_term)
         super().__init__(smt, solver_term, sort)
 
     def __repr__(self):
@@ -421,7 +456,7 @@ class BoolectorTerm(TermBase):
         '''
         Gets value of array as list of tuples in order of store operators
         '''
-        if self.sort.__class__ != sorts.Array:
+        if self.sort.__class__ is not sorts.Array:
             raise RuntimeError("Cannot call as_list on sort: {}".format(self.sort))
         return self._value.assignment
 
@@ -432,7 +467,3 @@ class BoolectorTerm(TermBase):
     @property
     def children(self):
         raise NotImplementedError('Boolector does not support querying children.')
-
-
-def __bool_fun(*args):
-    return sorts.Bool()
@@ -244,6 +244,25 @@ def test_r_ops():
         x2 = s.DeclareConst('x2', bvsort8)
         x3 = s.DeclareConst('x3', bvsort8)
 
+def test_apply_batch():
+    for name in bv_solvers:
+        s = smt(name)
+        s.SetOption('produce-models', 'true')
+        s.SetLogic('QF_BV')
+
+        bvsort8 = s.BitVec(8)
+        x = s.DeclareConst('x', bvsort8)
+        y = s.DeclareConst('y', bvsort8)
+
+        sums = s.ApplyFunBatch(s.BVAdd, [(x, 1), (y, 2), [x, y]])
+        assert len(sums) == 3
+
+        s.Assert(x == 3)
+        s.Assert(y == 4)
+        s.CheckSat()
+
+        assert [s.GetValue(t).as_int() for t in sums] == [4, 6, 7]
+
 def test_distinct():
     # Currently only implemented in Z3 and CVC4
     for n in ["CVC4", "Z3"]:
@@ -266,6 +285,31 @@ def test_distinct():
 
         assert x1val != x2val and x1val != x3val and x2val != x3val
 
+def test_flatten_assoc():
+    # CVC4 flattens nested applications of associative operators
+    s = smt("CVC4")
+    s.SetLogic('QF_BV')
+
+    a = s.DeclareConst('a', s.Bool())
+    b = s.DeclareConst('b', s.Bool())
+    c = s.DeclareConst('c', s.Bool())
+
+    abc = s.And(s.And(a, b), c)
+    assert len(abc.children) == 3
+
+    # a chain is only flattened while the nested term is within the limit
+    limit = s.solver._CVC4FlattenLimit
+    xs = [s.DeclareConst('x{}'.format(i), s.BitVec(8)) for i in range(limit + 2)]
+
+    chain = xs[0]
+    for x in xs[1:limit + 1]:
+        chain = s.BVAnd(chain, x)
+    assert len(chain.children) == limit + 1
+
+    chain = s.BVAnd(chain, xs[limit + 1])
+    assert len(chain.children) == 2
+    assert len(chain.children[0].children) == limit + 1
+
 if __name__ == "__main__":
     test_bv_ops()
     test_bv_multdivide()
@@ -53,8 +53,64 @@ def test_pushpop():
         assert s.CheckSat(), 'Expecting sat again'
 
 
+def test_assertions_pushpop():
+    '''
+    Check that assertions are recorded and dropped again on pop
+    '''
+
+    for name in bv_solvers:
+        s = smt(name)
+        s.SetLogic('QF_BV')
+        s.SetOption('incremental', 'true')
+        s.SetOption('produce-assertions', 'true')
+
+        b1 = s.DeclareConst("b1", s.BitVec(4))
+        b2 = s.DeclareConst("b2", s.BitVec(4))
+
+        s.Assert(s.BVUlt(b1, b2))
+        assert len(s.Assertions) == 1
+
+        s.Push()
+        s.Assert(s.BVUlt(b2, b1), b1 == b2)
+        assert len(s.Assertions) == 3
+
+        s.Pop()
+        assert len(s.Assertions) == 1
+
+
+def test_iter_assertions():
+    '''
+    Check that IterAssertions gives the assertions at the time it's called
+    '''
+
+    for name in all_logic_solvers:
+        s = smt(name)
+        s.SetLogic('QF_BV')
+        s.SetOption('incremental', 'true')
+        s.SetOption('produce-assertions', 'true')
+
+        b1 = s.DeclareConst("b1", s.BitVec(4))
+        b2 = s.DeclareConst("b2", s.BitVec(4))
+
+        s.Assert(s.BVUlt(b1, b2))
+        s.Push()
+        s.Assert(s.BVUlt(b2, b1))
+
+        pushed = s.Assertions
+        assert len(pushed) == 2
+
+        assertions = s.IterAssertions()
+        s.Pop()
+        assert list(assertions) == pushed
+        assert list(s.IterAssertions()) == s.Assertions == pushed[:1]
+
+
 if __name__ == "__main__":
     print("before test_incremental")
     test_incremental()
     print("before test_pushpop")
     test_pushpop()
+    print("before test_assertions_pushpop")
+    test_assertions_pushpop()
+    print("before test_iter_assertions")
+    test_iter_assertions()
@@ -32,5 +32,74 @@ def test_consts():
         assert not s.CheckSat(), "Expected unsat for simple constant test. Solver={}".format(name)
 
 
+def test_term_sharing():
+    '''
+    Check that identical function applications return the same term
+    when terms are shared, and only within a scope
+    '''
+
+    for name in bv_solvers:
+        s = smt(name)
+        x = s.DeclareConst('x', s.BitVec(4))
+        assert (x + 1) is not (x + 1), "Terms are only shared with share_terms"
+
+        s = smt(name, share_terms=True)
+        s.SetLogic('QF_BV')
+        s.SetOption('incremental', 'true')
+        x = s.DeclareConst('x', s.BitVec(4))
+        y = s.DeclareConst('y', s.BitVec(4))
+
+        assert (x + 1) is (x + 1)
+        assert (x + 1) is not (x + 2)
+        assert x[2:1] is s.Extract(2, 1, x)
+
+        t = x + 1
+        s.ClearTermCache()
+        assert (x + 1) is not t
+
+        s.Push()
+        t = x + 1
+        s.Pop()
+        assert (x + 1) is not t
+
+        if name == 'Boolector':
+            # symbolic shifts assert a side constraint, so they're never shared
+            assert (x << y) is not (x << y)
+
+
+def test_sort_interning():
+    '''
+    Check that identical sorts are the same object, however they're constructed
+    '''
+
+    s = smt('Z3')
+    assert s.BitVec(8) is s.BitVec(8)
+    assert s.BitVec(width=8) is s.BitVec(8)
+    assert s.Array(s.BitVec(4), s.BitVec(8)) is s.Array(dsort=s.BitVec(8), idxsort=s.BitVec(4))
+    assert s.BitVec(8) is not s.BitVec(4)
+
+
+def test_assert_smtlib():
+    '''
+    Check that assertions given as SMT-LIB text are asserted
+    '''
+
+    for name in all_logic_solvers:
+        s = smt(name)
+        s.SetLogic('QF_LIA')
+        s.SetOption('incremental', 'true')
+        constraints = s.AssertSmtlib('(declare-fun x () Int) (assert (> x 3)) (assert (< x 5))'
+                                     '(check-sat)')
+        assert len(constraints) == 2
+        assert len(s.constraints) == 2
+        assert s.CheckSat(), "Expected sat. Solver={}".format(name)
+
+        s.AssertSmtlib('(assert false)')
+        assert not s.CheckSat(), "Expected unsat. Solver={}".format(name)
+
+
 if __name__ == "__main__":
     test_consts()
+    test_term_sharing()
+    test_sort_interning()
+    test_assert_smtlib()
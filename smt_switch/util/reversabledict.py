@@ -36,6 +36,12 @@ class reversabledict:
         rd._r = self._d
         return rd
 
+    def __contains__(self, key):
+        return key in self._d
+
+    def items(self):
+        return self._d.items()
+
     def __len__(self):
         return len(self._d)
 